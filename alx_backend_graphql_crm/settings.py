@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'crm.middleware.DataLoaderMiddleware',
 ]
 
 ROOT_URLCONF = 'alx_backend_graphql_crm.urls'
@@ -71,9 +72,30 @@ TEMPLATES = [
 ]
 
 GRAPHENE = {
-    "SCHEMA": "alx_backend_graphql_crm.schema.schema"
+    "SCHEMA": "alx_backend_graphql_crm.schema.schema",
+    # Upper bound on (and default for) first/last on relay connections
+    "RELAY_CONNECTION_MAX_LIMIT": 100,
 }
 
+# The GraphQL query cache (crm/cache.py) is off unless the default cache is
+# Redis or Memcached, shared by every worker and by shell/cron processes.
+# With Django's default LocMemCache, or a DatabaseCache that would cost more
+# queries than it saves, read-only queries always hit the database. To enable:
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.redis.RedisCache",
+#         "LOCATION": "redis://127.0.0.1:6379",
+#     }
+# }
+
+# Seconds a read-only GraphQL query result is served from the cache
+GRAPHQL_QUERY_CACHE_TIMEOUT = 30
+
+# Limits enforced on incoming GraphQL operations (see crm/validation.py).
+# Depth counts fields, excluding relay's edges/node connection wrappers.
+GRAPHQL_MAX_QUERY_DEPTH = 8
+GRAPHQL_MAX_QUERY_COST = 1000
+
 # CRONJOBS = [
 #     ('*/5 * * * *', 'crm.cron.log_crm_heartbeat'),
 # ]
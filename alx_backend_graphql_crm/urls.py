@@ -16,11 +16,20 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
+from graphql_sync_dataloaders import DeferredExecutionContext
+from crm.validation import get_validation_rules
+from crm.views import CachedGraphQLView
 from .schema import schema
 from django.views.decorators.csrf import csrf_exempt
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path("graphql", csrf_exempt(GraphQLView.as_view(schema=schema, graphiql=True))),
+    path("graphql", csrf_exempt(CachedGraphQLView.as_view(
+        schema=schema,
+        graphiql=True,
+        # resolves the DataLoader futures returned by crm resolvers in batches
+        execution_context_class=DeferredExecutionContext,
+        # reject over-deep or over-expensive queries before any resolver runs
+        validation_rules=get_validation_rules(),
+    ))),
 ]
@@ -0,0 +1,54 @@
+# crm/cache.py
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.memcached import PyLibMCCache, PyMemcacheCache
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every write so stale query results stop being addressable
+GENERATION_KEY = "crm:graphql:generation"
+
+# The query cache only pays off on an out-of-DB store shared by every worker
+# and by shell/cron processes (so their invalidations are seen). With any
+# other default backend (LocMemCache, DatabaseCache, ...) it stays off.
+SHARED_BACKENDS = (RedisCache, PyMemcacheCache, PyLibMCCache)
+
+
+def get_cache():
+    return caches["default"]
+
+
+def is_enabled():
+    return isinstance(get_cache(), SHARED_BACKENDS)
+
+
+def get_timeout():
+    return getattr(settings, "GRAPHQL_QUERY_CACHE_TIMEOUT", 30)
+
+
+def query_cache_key(query, variables, operation_name):
+    """Build a cache key from the current generation and the normalized request."""
+    generation = get_cache().get_or_set(GENERATION_KEY, 1, timeout=None)
+    payload = query + json.dumps(variables or {}, sort_keys=True) + (operation_name or "")
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"crm:graphql:{generation}:{digest}"
+
+
+def invalidate_query_cache():
+    if not is_enabled():
+        return
+    cache = get_cache()
+    try:
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            # key missing or evicted; any fresh value orphans the old entries
+            cache.set(GENERATION_KEY, 1, timeout=None)
+    except Exception:
+        # an unreachable cache must not fail the write that triggered this
+        logger.exception("Could not invalidate the GraphQL query cache")
@@ -10,8 +10,9 @@ class CustomerFilter(django_filters.FilterSet):
     created_at_gte = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
     created_at_lte = django_filters.DateFilter(field_name="created_at", lookup_expr="lte")
 
-    # phone_pattern: method filter to support startswith, contains, etc.
-    phone_pattern = django_filters.CharFilter(method="filter_phone_pattern")
+    # phone lookups: phoneStartswith: "+1" (prefix), phoneIcontains: "123" (anywhere)
+    phone_startswith = django_filters.CharFilter(field_name="phone", lookup_expr="startswith")
+    phone_icontains = django_filters.CharFilter(field_name="phone", lookup_expr="icontains")
 
     # Optional ordering
     order_by = django_filters.OrderingFilter(
@@ -27,20 +28,6 @@ class CustomerFilter(django_filters.FilterSet):
         # fields names are not necessary here because we declared explicit filters
         fields = []
 
-    def filter_phone_pattern(self, queryset, name, value):
-        """
-        Support patterns like:
-        - +1  (starts with +1)
-        - 123 (contains 123)
-        If value starts with '^' treat as startswith
-        """
-        if not value:
-            return queryset
-        # simple convention: if value starts with + or digits, do startswith; else use contains
-        if value.startswith("+") or value[0].isdigit():
-            return queryset.filter(phone__startswith=value)
-        return queryset.filter(phone__icontains=value)
-
 
 class ProductFilter(django_filters.FilterSet):
     name_icontains = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
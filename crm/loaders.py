@@ -0,0 +1,22 @@
+# crm/loaders.py
+from graphql_sync_dataloaders import SyncDataLoader
+
+from .models import Customer
+
+
+def load_customers(keys):
+    # one IN query for every customer id requested during this execution tick
+    customers = Customer.objects.in_bulk(keys)
+    return [customers.get(key) for key in keys]
+
+
+class Loaders:
+    """Request-scoped DataLoaders, so cached entities never leak across requests."""
+
+    def __init__(self):
+        self.customer = SyncDataLoader(load_customers)
+
+
+def get_loaders(info):
+    """Return the loaders attached to this request, or None outside a request."""
+    return getattr(info.context, "loaders", None)
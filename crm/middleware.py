@@ -0,0 +1,13 @@
+# crm/middleware.py
+from .loaders import Loaders
+
+
+class DataLoaderMiddleware:
+    """Attach a fresh set of DataLoaders to every incoming request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.loaders = Loaders()
+        return self.get_response(request)
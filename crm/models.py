@@ -1,6 +1,9 @@
 # from django.db import models
 # Create your models here.
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Sum
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
@@ -21,6 +24,14 @@ class Customer(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # created_at range filters/ordering in CustomerFilter; email is already indexed
+        # via unique=True. phone is left unindexed: its startswith/icontains lookups
+        # compile to LIKE, which a plain B-tree index can't serve.
+        indexes = [
+            models.Index(fields=["created_at"], name="crm_customer_created_at_idx"),
+        ]
+
     def __str__(self):
         # return the customer's name as requested
         return self.name
@@ -34,6 +45,13 @@ class Product(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # range filters used by ProductFilter (priceGte/Lte, stockGte/Lte, lowStock)
+        indexes = [
+            models.Index(fields=["price"], name="crm_product_price_idx"),
+            models.Index(fields=["stock"], name="crm_product_stock_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} (${self.price})"
 
@@ -46,10 +64,17 @@ class Order(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # range filters and ordering used by OrderFilter
+        indexes = [
+            models.Index(fields=["order_date"], name="crm_order_order_date_idx"),
+            models.Index(fields=["total_amount"], name="crm_order_total_amount_idx"),
+        ]
+
     def calculate_total(self):
-        total = sum([p.price for p in self.products.all()])
-        # Using quantize may be required, but DecimalField will accept Decimal
-        return total
+        # Let the database sum the prices instead of loading every product row
+        total = self.products.aggregate(total=Sum("price"))["total"]
+        return total or Decimal("0.00")
 
     def __str__(self):
         return f"Order #{self.pk} for {self.customer}"
@@ -1,6 +1,7 @@
 import re
 from decimal import Decimal
 from django.db import transaction
+from django.utils import timezone
 import graphene
 from graphene import Field, List, String, Int, Float, ID
 from graphene_django import DjangoObjectType
@@ -28,21 +29,42 @@ class OrderType(DjangoObjectType):
         fields = ("id", "customer", "products", "order_date", "total_amount", "created_at")
 
 
+# Read-only row types for the list queries. They resolve straight from the
+# dicts returned by QuerySet.values(), skipping model instantiation.
+class CustomerRowType(graphene.ObjectType):
+    id = ID()
+    name = String()
+    email = String()
+    phone = String()
+    created_at = graphene.DateTime()
+
+
+class ProductRowType(graphene.ObjectType):
+    id = ID()
+    name = String()
+    price = graphene.Decimal()
+    stock = Int()
+    created_at = graphene.DateTime()
+
+
 # ---------------------
 # Helpers & validators
 # ---------------------
-PHONE_REGEXES = [
-    re.compile(r'^\+\d{7,15}$'),          # +1234567890...
-    re.compile(r'^\d{3}-\d{3}-\d{4}$'),   # 123-456-7890
-]
+# Shared zero for money sums and the quantum prices are rounded to
+ZERO_AMOUNT = Decimal('0.00')
+
+# +1234567890... or 123-456-7890, fused into one alternation so each phone is scanned once
+PHONE_REGEX = re.compile(r'^(?:\+\d{7,15}|\d{3}-\d{3}-\d{4})$')
 
 def validate_phone(phone: str) -> bool:
-    if phone is None or phone == "":
-        return True
-    for rx in PHONE_REGEXES:
-        if rx.match(phone):
-            return True
-    return False
+    return not phone or PHONE_REGEX.match(phone) is not None
+
+def to_pk(value):
+    """Coerce a GraphQL ID to an integer primary key, or None if malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 # ---------------------
 # Mutations
@@ -116,35 +138,66 @@ class BulkCreateCustomers(graphene.Mutation):
         created = []
         errors = []
 
-        # We attempt to create each customer independently so partial success is possible.
-        # If you want single-transaction behavior (all-or-nothing), wrap in transaction.atomic()
-        for idx, c in enumerate(input, start=1):
-            name = c.name.strip()
-            email = c.email.strip().lower()
-            phone = c.phone.strip() if getattr(c, "phone", None) else None
+        # Validate each record independently so partial success is possible, then
+        # insert the survivors in one statement. Email uniqueness is left to the
+        # database's unique index, so there is no read-before-write to race against.
+        # Normalize each column in one comprehension, then validate in a single pass
+        names = [c.name.strip() for c in input]
+        emails = [c.email.strip().lower() for c in input]
+        phones = [(c.phone or "").strip() or None for c in input]
+        valid_phones = list(map(validate_phone, phones))
+
+        seen = set()
+        candidates = []
 
+        rows = zip(names, emails, phones, valid_phones)
+        for idx, (name, email, phone, phone_ok) in enumerate(rows, start=1):
             # Basic validations
             if not name:
-                errors.append(f"Record {idx}: name is required.")
+                errors.append((idx, f"Record {idx}: name is required."))
                 continue
             if not email:
-                errors.append(f"Record {idx}: email is required.")
+                errors.append((idx, f"Record {idx}: email is required."))
                 continue
-            if not validate_phone(phone):
-                errors.append(f"Record {idx}: invalid phone format for email {email}.")
+            if not phone_ok:
+                errors.append((idx, f"Record {idx}: invalid phone format for email {email}."))
                 continue
-            if Customer.objects.filter(email=email).exists():
-                errors.append(f"Record {idx}: email {email} already exists.")
+            if email in seen:
+                errors.append((idx, f"Record {idx}: email {email} already exists."))
                 continue
 
-            # Create the customer
+            seen.add(email)
+            candidates.append((idx, email, Customer(name=name, email=email, phone=phone)))
+
+        # Create the customers
+        if candidates:
             try:
-                cust = Customer.objects.create(name=name, email=email, phone=phone)
-                created.append(cust)
+                # one transaction (and one commit) for the whole batch
+                with transaction.atomic():
+                    started_at = timezone.now()
+                    Customer.objects.bulk_create(
+                        [cust for _, _, cust in candidates], batch_size=500, ignore_conflicts=True
+                    )
+                    # ignore_conflicts silently skips existing emails and leaves pks unset,
+                    # so read back the rows this batch actually inserted
+                    inserted = {
+                        cust.email: cust
+                        for cust in Customer.objects.filter(email__in=seen, created_at__gte=started_at)
+                    }
             except Exception as exc:
-                errors.append(f"Record {idx}: unexpected error creating {email}: {str(exc)}")
-                continue
-
+                # batch-level failure; sorts after every record
+                errors.append((len(input) + 1, f"Unexpected error creating customers: {str(exc)}"))
+            else:
+                for idx, email, cust in candidates:
+                    row = inserted.get(email)
+                    # a row with our email but other data was inserted concurrently by
+                    # someone else and ours was skipped as a conflict
+                    if row is not None and (row.name, row.phone) == (cust.name, cust.phone):
+                        created.append(row)
+                    else:
+                        errors.append((idx, f"Record {idx}: email {email} already exists."))
+
+        errors = [message for _, message in sorted(errors, key=lambda error: error[0])]
         return BulkCreateCustomersPayload(customers=created, errors=errors)
 
 
@@ -170,7 +223,8 @@ class CreateProduct(graphene.Mutation):
     @classmethod
     def mutate(cls, root, info, input):
         name = input.name.strip()
-        price = Decimal(str(input.price))
+        # str() gives the shortest repr of the float; round to cents in the same step
+        price = Decimal(str(input.price)).quantize(ZERO_AMOUNT)
         stock = input.stock if input.stock is not None else 0
 
         if price <= 0:
@@ -208,7 +262,7 @@ class CreateOrder(graphene.Mutation):
 
         # Validate customer
         try:
-            customer = Customer.objects.get(pk=input.customer_id)
+            customer = Customer.objects.only("id").get(pk=input.customer_id)
         except (Customer.DoesNotExist, ValueError):
             return CreateOrderPayload(order=None, success=False, message="Invalid customer ID.", errors=["Invalid customer ID."])
 
@@ -217,13 +271,23 @@ class CreateOrder(graphene.Mutation):
         if not product_ids:
             return CreateOrderPayload(order=None, success=False, message="At least one product must be selected.", errors=["At least one product is required."])
 
-        products = []
-        for pid in product_ids:
-            try:
-                p = Product.objects.get(pk=pid)
-                products.append(p)
-            except (Product.DoesNotExist, ValueError):
+        # An order links each product at most once (the m2m is a set), so a repeated
+        # ID is rejected rather than silently collapsed out of total_amount
+        pks = [to_pk(pid) for pid in product_ids]
+        seen_pks = set()
+        for pid, pk in zip(product_ids, pks):
+            if pk is not None and pk in seen_pks:
+                errors.append(f"Duplicate product ID: {pid}")
+            seen_pks.add(pk)
+        if errors:
+            return CreateOrderPayload(order=None, success=False, message="Each product may only be ordered once.", errors=errors)
+
+        # Fetch all products in one query and report the IDs that did not resolve
+        products_map = Product.objects.in_bulk([pk for pk in pks if pk is not None])
+        for pid, pk in zip(product_ids, pks):
+            if pk not in products_map:
                 errors.append(f"Invalid product ID: {pid}")
+        products = list(products_map.values())
 
         if errors:
             return CreateOrderPayload(order=None, success=False, message="One or more product IDs are invalid.", errors=errors)
@@ -231,15 +295,16 @@ class CreateOrder(graphene.Mutation):
         # All validations passed. Create the Order and associate products.
         try:
             with transaction.atomic():
-                order = Order.objects.create(customer=customer)
-                # add products and compute total
-                order.products.set(products)
-                # calculate total_amount as sum of product.price
-                total = Decimal('0.00')
-                for p in products:
-                    total += p.price
-                order.total_amount = total
-                order.save()
+                # calculate total_amount as sum of product.price up front so the
+                # order is written by a single INSERT
+                total = sum((p.price for p in products), ZERO_AMOUNT)
+                order = Order.objects.create(customer_id=customer.pk, total_amount=total)
+                # a new order has no products, so write the m2m rows in one INSERT
+                # without add()/set()'s lookup of existing rows
+                OrderProduct = Order.products.through
+                OrderProduct.objects.bulk_create(
+                    [OrderProduct(order_id=order.pk, product_id=p.pk) for p in products], batch_size=500
+                )
         except Exception as exc:
             return CreateOrderPayload(order=None, success=False, message=f"Error creating order: {str(exc)}", errors=[str(exc)])
 
@@ -259,16 +324,18 @@ class Mutation(graphene.ObjectType):
 # Expose Query placeholders (if CRM app later adds Query fields)
 class Query(graphene.ObjectType):
     # You can add query fields here for customers/products/orders (optional)
-    customers = List(CustomerType)
-    products = List(ProductType)
+    customers = List(CustomerRowType)
+    products = List(ProductRowType)
     orders = List(OrderType)
 
+    # These lists are unpaginated, so stream rows in chunks instead of
+    # materializing the whole table at once.
     def resolve_customers(root, info):
-        return Customer.objects.all()
+        return Customer.objects.values("id", "name", "email", "phone", "created_at").iterator(chunk_size=2000)
 
     def resolve_products(root, info):
-        return Product.objects.all()
+        return Product.objects.values("id", "name", "price", "stock", "created_at").iterator(chunk_size=2000)
 
     def resolve_orders(root, info):
-        return Order.objects.select_related("customer").prefetch_related("products").all()
+        return Order.objects.select_related("customer").prefetch_related("products").iterator(chunk_size=2000)
 
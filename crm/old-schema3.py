@@ -33,21 +33,40 @@ class OrderType(DjangoObjectType):
         fields = ("id", "customer", "products", "total_amount", "order_date")
 
 
+# Read-only row types for the list queries, resolved straight from the dicts
+# returned by QuerySet.values() instead of full model instances.
+class CustomerRowType(graphene.ObjectType):
+    id = ID()
+    name = String()
+    email = String()
+    phone = String()
+
+
+class ProductRowType(graphene.ObjectType):
+    id = ID()
+    name = String()
+    price = graphene.Decimal()
+    stock = Int()
+
+
 # -------------------------
 # Helpers & Validators
 # -------------------------
-PHONE_PATTERNS = [
-    re.compile(r'^\+\d{7,15}$'),        # +1234567890...
-    re.compile(r'^\d{3}-\d{3}-\d{4}$')  # 123-456-7890
-]
+# Shared zero for money sums and the quantum prices are rounded to
+ZERO_AMOUNT = Decimal("0.00")
+
+# +1234567890... or 123-456-7890, fused into one alternation so each phone is scanned once
+PHONE_PATTERN = re.compile(r'^(?:\+\d{7,15}|\d{3}-\d{3}-\d{4})$')
 
 def is_valid_phone(phone: str) -> bool:
-    if phone is None or phone == "":
-        return True
-    for p in PHONE_PATTERNS:
-        if p.match(phone):
-            return True
-    return False
+    return not phone or PHONE_PATTERN.match(phone) is not None
+
+def to_pk(value):
+    """Coerce a GraphQL ID to an integer primary key, or None if malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 # -------------------------
 # Mutations
@@ -121,32 +140,66 @@ class BulkCreateCustomers(graphene.Mutation):
         created = []
         errors = []
 
-        # Partial success: attempt each record independently, record errors and continue.
-        for idx, rec in enumerate(input, start=1):
-            name = (rec.name or "").strip()
-            email = (rec.email or "").strip().lower()
-            phone = (rec.phone or "").strip() if getattr(rec, "phone", None) else None
+        # Partial success: validate each record independently, record errors and
+        # continue. Survivors are inserted with one bulk_create and the unique
+        # index on email rejects duplicates, so there is no read-before-write.
+        # Normalize each column in one comprehension, then validate in a single pass
+        names = [(rec.name or "").strip() for rec in input]
+        emails = [(rec.email or "").strip().lower() for rec in input]
+        phones = [(rec.phone or "").strip() or None for rec in input]
+        valid_phones = list(map(is_valid_phone, phones))
+
+        seen = set()
+        candidates = []
 
+        rows = zip(names, emails, phones, valid_phones)
+        for idx, (name, email, phone, phone_ok) in enumerate(rows, start=1):
             if not name:
-                errors.append(f"Record {idx}: name is required.")
+                errors.append((idx, f"Record {idx}: name is required."))
                 continue
             if not email:
-                errors.append(f"Record {idx}: email is required.")
+                errors.append((idx, f"Record {idx}: email is required."))
                 continue
-            if phone and not is_valid_phone(phone):
-                errors.append(f"Record {idx} ({email}): invalid phone format.")
+            if not phone_ok:
+                errors.append((idx, f"Record {idx} ({email}): invalid phone format."))
                 continue
-            if Customer.objects.filter(email=email).exists():
-                errors.append(f"Record {idx} ({email}): email already exists.")
+            if email in seen:
+                errors.append((idx, f"Record {idx} ({email}): email already exists."))
                 continue
 
+            seen.add(email)
+            candidates.append((idx, email, Customer(name=name, email=email, phone=phone)))
+
+        if candidates:
             try:
-                cust = Customer.objects.create(name=name, email=email, phone=phone)
-                created.append(cust)
+                # one transaction (and one commit) for the whole batch
+                with transaction.atomic():
+                    started_at = timezone.now()
+                    Customer.objects.bulk_create(
+                        [cust for _, _, cust in candidates], batch_size=500, ignore_conflicts=True
+                    )
+                    # ignore_conflicts silently skips existing emails and leaves pks unset,
+                    # so read back the rows this batch actually inserted
+                    inserted = {
+                        cust.email: cust
+                        for cust in Customer.objects.filter(
+                            email__in=seen, created_at__gte=started_at
+                        ).only("id", "name", "email", "phone")
+                    }
             except Exception as exc:
-                errors.append(f"Record {idx} ({email}): unexpected error: {str(exc)}")
-                continue
-
+                # batch-level failure; sorts after every record
+                errors.append((len(input) + 1, f"Unexpected error creating customers: {str(exc)}"))
+            else:
+                for idx, email, cust in candidates:
+                    row = inserted.get(email)
+                    # a row with our email but other data was inserted concurrently by
+                    # someone else and ours was skipped as a conflict
+                    if row is not None and (row.name, row.phone) == (cust.name, cust.phone):
+                        created.append(row)
+                    else:
+                        errors.append((idx, f"Record {idx} ({email}): email already exists."))
+
+        errors = [message for _, message in sorted(errors, key=lambda error: error[0])]
         return BulkCreateCustomersPayload(customers=created, errors=errors)
 
 
@@ -175,7 +228,8 @@ class CreateProduct(graphene.Mutation):
 
         # Validate price and stock
         try:
-            price = Decimal(str(input.price))
+            # str() gives the shortest repr of the float; round to cents in the same step
+            price = Decimal(str(input.price)).quantize(ZERO_AMOUNT)
         except (InvalidOperation, TypeError, ValueError):
             return CreateProductPayload(product=None, success=False, message="Invalid price.", errors=["Price must be a number."])
 
@@ -214,7 +268,7 @@ class CreateOrder(graphene.Mutation):
         errors = []
         # Validate customer
         try:
-            customer = Customer.objects.get(pk=input.customer_id)
+            customer = Customer.objects.only("id").get(pk=input.customer_id)
         except (Customer.DoesNotExist, ValueError):
             return CreateOrderPayload(order=None, success=False, message="Invalid customer ID.", errors=["Invalid customer ID."])
 
@@ -222,14 +276,22 @@ class CreateOrder(graphene.Mutation):
         if not product_ids:
             return CreateOrderPayload(order=None, success=False, message="At least one product must be provided.", errors=["At least one product must be provided."])
 
-        products = []
-        invalid_ids = []
-        for pid in product_ids:
-            try:
-                p = Product.objects.get(pk=pid)
-                products.append(p)
-            except (Product.DoesNotExist, ValueError):
-                invalid_ids.append(str(pid))
+        # An order links each product at most once (the m2m is a set), so a repeated
+        # ID is rejected rather than silently collapsed out of total_amount
+        pks = [to_pk(pid) for pid in product_ids]
+        seen_pks = set()
+        duplicate_ids = []
+        for pid, pk in zip(product_ids, pks):
+            if pk is not None and pk in seen_pks:
+                duplicate_ids.append(str(pid))
+            seen_pks.add(pk)
+        if duplicate_ids:
+            return CreateOrderPayload(order=None, success=False, message="Each product may only be ordered once.", errors=[f"Duplicate product IDs: {', '.join(duplicate_ids)}"])
+
+        # Fetch all products in one query and report the IDs that did not resolve
+        products_map = Product.objects.in_bulk([pk for pk in pks if pk is not None])
+        invalid_ids = [str(pid) for pid, pk in zip(product_ids, pks) if pk not in products_map]
+        products = list(products_map.values())
 
         if invalid_ids:
             return CreateOrderPayload(order=None, success=False, message="Invalid product IDs provided.", errors=[f"Invalid product IDs: {', '.join(invalid_ids)}"])
@@ -243,19 +305,21 @@ class CreateOrder(graphene.Mutation):
                         order_date = timezone.datetime.fromisoformat(input.order_date)
                     except Exception:
                         order_date = None
-                order = Order.objects.create(customer=customer, order_date=order_date or timezone.now())
-
-                # attach products
-                order.products.set(products)
-
-                # Ensure total_amount calculated as sum of product prices
-                total = Decimal("0.00")
-                for p in products:
-                    total += p.price
-
-                # Save total_amount with appropriate precision
-                order.total_amount = total
-                order.save(update_fields=["total_amount"])
+                # Ensure total_amount calculated as sum of product prices, before the
+                # INSERT so no follow-up UPDATE is needed
+                total = sum((p.price for p in products), ZERO_AMOUNT)
+                order = Order.objects.create(
+                    customer_id=customer.pk,
+                    order_date=order_date or timezone.now(),
+                    total_amount=total,
+                )
+
+                # attach products; the order is new, so write the m2m rows in one INSERT
+                # without add()/set()'s lookup of existing rows
+                OrderProduct = Order.products.through
+                OrderProduct.objects.bulk_create(
+                    [OrderProduct(order_id=order.pk, product_id=p.pk) for p in products], batch_size=500
+                )
 
         except Exception as exc:
             return CreateOrderPayload(order=None, success=False, message="Error creating order.", errors=[str(exc)])
@@ -278,17 +342,25 @@ class Mutation(graphene.ObjectType):
 # -------------------------
 class Query(graphene.ObjectType):
     # Provide a simple query to list customers (useful for testing)
-    all_customers = graphene.List(CustomerType)
-    all_products = graphene.List(ProductType)
+    all_customers = graphene.List(CustomerRowType)
+    all_products = graphene.List(ProductRowType)
     all_orders = graphene.List(OrderType)
 
     def resolve_all_customers(root, info, **kwargs):
-        return Customer.objects.all()
+        # fetch only the columns CustomerRowType exposes; these lists are unpaginated,
+        # so stream rows in chunks instead of materializing the whole table
+        return Customer.objects.values("id", "name", "email", "phone").iterator(chunk_size=2000)
 
     def resolve_all_products(root, info, **kwargs):
-        return Product.objects.all()
+        return Product.objects.values("id", "name", "price", "stock").iterator(chunk_size=2000)
 
     def resolve_all_orders(root, info, **kwargs):
         # optimize with prefetch_related
-        return Order.objects.select_related("customer").prefetch_related("products").all()
+        return (
+            Order.objects.select_related("customer")
+            .prefetch_related("products")
+            .only("id", "total_amount", "order_date",
+                  "customer__id", "customer__name", "customer__email", "customer__phone")
+            .iterator(chunk_size=2000)
+        )
 
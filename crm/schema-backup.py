@@ -32,6 +32,11 @@ class OrderNode(DjangoObjectType):
         # include nested relations
         fields = ("id", "customer", "products", "total_amount", "order_date")
 
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        # load the nested customer/products with the page instead of once per order
+        return queryset.select_related("customer").prefetch_related("products")
+
 
 class Query(graphene.ObjectType):
     # Expose Relay connection fields that support filtering
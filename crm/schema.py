@@ -1,13 +1,66 @@
+from decimal import Decimal
+
 import graphene
-from graphene_django import DjangoObjectType
+from graphene_django import DjangoConnectionField, DjangoObjectType
 from django.db import transaction
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.utils import timezone
-from graphql import GraphQLError
+from graphql import FieldNode, GraphQLError
+from graphene.utils.str_converters import to_snake_case
 
 # from crm.models import Product
 
 from .models import Customer, Product, Order
+from .loaders import get_loaders
+
+
+# ---------------- Helpers ----------------
+# Shared zero for money sums; allocated once rather than per request
+ZERO_AMOUNT = Decimal("0.00")
+
+
+def get_selected_fields(info):
+    """
+    Return the snake_case names of the fields selected on the nodes of this
+    connection field (edges { node { ... } }), or None when the selection
+    uses fragments and can't be analysed statically.
+    """
+    nodes = info.field_nodes
+    for name in ("edges", "node"):
+        children = []
+        for node in nodes:
+            for selection in getattr(node.selection_set, "selections", ()):
+                if not isinstance(selection, FieldNode):
+                    return None
+                if selection.name.value == name:
+                    children.append(selection)
+        nodes = children
+
+    fields = set()
+    for node in nodes:
+        for selection in getattr(node.selection_set, "selections", ()):
+            if not isinstance(selection, FieldNode):
+                return None
+            fields.add(to_snake_case(selection.name.value))
+    return fields
+
+
+def get_selected_columns(fields, model):
+    """Map selected field names to the model's concrete columns (customer -> customer_id)."""
+    concrete = {f.name: f.attname for f in model._meta.concrete_fields}
+    return {concrete[name] for name in fields if name in concrete}
+
+
+def prefetch_selected(qs, fields, relations):
+    """
+    Prefetch each relation only if its field (or a field reading it) was
+    selected; with an unknown selection (None) prefetch all of them.
+    """
+    lookups = [
+        lookup for lookup, field_names in relations.items()
+        if fields is None or fields & field_names
+    ]
+    return qs.prefetch_related(*lookups) if lookups else qs
 
 
 # ---------------- GraphQL Types (Relay-Compatible) ----------------
@@ -35,8 +88,16 @@ class OrderType(DjangoObjectType):
     # Add singular product for compatibility
     product = graphene.Field(ProductType)
 
+    def resolve_customer(self, info):
+        # batch customer lookups across every order in the response
+        loaders = get_loaders(info)
+        if loaders is None:
+            return self.customer
+        return loaders.customer.load(self.customer_id)
+
     def resolve_product(self, info):
-        return self.products.first()
+        # first() would bypass the prefetched products and issue a new query per order
+        return min(self.products.all(), key=lambda p: p.pk, default=None)
 
     class Meta:
         model = Order
@@ -133,25 +194,56 @@ class BulkCreateCustomers(graphene.Mutation):
         created_customers = []
         errors = []
 
-        with transaction.atomic():
-            for data in input:
-                try:
-                    if Customer.objects.filter(email=data.email).exists():
-                        errors.append(f"Email already exists: {data.email}")
-                        continue
-                    customer = Customer(
-                        name=data.name,
-                        email=data.email,
-                        phone=data.phone
-                    )
-                    customer.full_clean()
-                    customer.save()
-                    created_customers.append(customer)
-                except ValidationError as e:
-                    errors.append(f"{data.email}: {str(e)}")
-                except Exception:
-                    errors.append(f"{data.email}: Failed to create customer")
+        # Email uniqueness is enforced by the database's unique index rather than
+        # a read-before-write, which a concurrent request could race past.
+        # Errors carry the record's position so they are reported in input order.
+        seen = set()
+        candidates = []
+
+        for idx, data in enumerate(input):
+            if data.email in seen:
+                errors.append((idx, f"Email already exists: {data.email}"))
+                continue
+            customer = Customer(
+                name=data.name,
+                email=data.email,
+                phone=data.phone
+            )
+            try:
+                # uniqueness is left to the unique index (see bulk_create below)
+                customer.full_clean(validate_unique=False)
+            except ValidationError as e:
+                errors.append((idx, f"{data.email}: {str(e)}"))
+                continue
+            seen.add(data.email)
+            candidates.append((idx, customer))
 
+        try:
+            with transaction.atomic():
+                started_at = timezone.now()
+                Customer.objects.bulk_create(
+                    [customer for _, customer in candidates], batch_size=500, ignore_conflicts=True
+                )
+                # ignore_conflicts silently skips existing emails and leaves pks unset,
+                # so read back the rows this batch actually inserted
+                inserted = {
+                    customer.email: customer
+                    for customer in Customer.objects.filter(email__in=seen, created_at__gte=started_at)
+                }
+        except Exception:
+            # batch-level failure; sorts after every record
+            errors.append((len(input), "Failed to create customers"))
+        else:
+            for idx, customer in candidates:
+                row = inserted.get(customer.email)
+                # a row with our email but other data was inserted concurrently by
+                # someone else and ours was skipped as a conflict
+                if row is not None and (row.name, row.phone) == (customer.name, customer.phone):
+                    created_customers.append(row)
+                else:
+                    errors.append((idx, f"Email already exists: {customer.email}"))
+
+        errors = [message for _, message in sorted(errors, key=lambda error: error[0])]
         return BulkCreateCustomers(customers=created_customers, errors=errors)
 
 
@@ -191,24 +283,42 @@ class CreateOrder(graphene.Mutation):
     def mutate(root, info, input):
         try:
             try:
-                customer = Customer.objects.get(pk=input.customer_id)
+                customer = Customer.objects.only("id").get(pk=input.customer_id)
             except ObjectDoesNotExist:
                 raise GraphQLError("Invalid customer ID") from None
 
-            products = Product.objects.filter(pk__in=input.product_ids)
-            if not products.exists():
+            # An order links each product at most once (the m2m is a set), so a repeated
+            # ID is rejected rather than silently collapsed out of total_amount
+            product_ids = [str(pid) for pid in input.product_ids]
+            seen_ids = set()
+            duplicate_ids = []
+            for pid in product_ids:
+                if pid in seen_ids:
+                    duplicate_ids.append(pid)
+                seen_ids.add(pid)
+            if duplicate_ids:
+                raise GraphQLError(f"Duplicate product IDs: {', '.join(duplicate_ids)}")
+
+            # Single IN query instead of separate exists()/count()/fetch round-trips
+            products = list(Product.objects.in_bulk(product_ids).values())
+            if not products:
                 raise GraphQLError("No valid products found")
-            if products.count() != len(set(map(str, input.product_ids))):
+            if len(products) != len(product_ids):
                 # If any product id is invalid, count will differ
                 raise GraphQLError("Some product IDs are invalid")
 
-            order = Order.objects.create(
-                customer=customer,
-                order_date=input.order_date or timezone.now(),
-                total_amount=sum([p.price for p in products])
-            )
-            order.products.set(products)
-            order.save()
+            with transaction.atomic():
+                order = Order.objects.create(
+                    customer_id=customer.pk,
+                    order_date=input.order_date or timezone.now(),
+                    total_amount=sum((p.price for p in products), ZERO_AMOUNT)
+                )
+                # the order is new, so insert the m2m rows directly: one multi-row INSERT,
+                # without add()'s lookup of existing rows
+                OrderProduct = Order.products.through
+                OrderProduct.objects.bulk_create(
+                    [OrderProduct(order_id=order.pk, product_id=p.pk) for p in products], batch_size=500
+                )
             return CreateOrder(order=order)
         except Exception as e:
             raise GraphQLError(f"Failed to create order: {str(e)}") from None
@@ -216,26 +326,29 @@ class CreateOrder(graphene.Mutation):
 
 # ---------------- Query (Task 3 with nested `filter`) ----------------
 class Query(graphene.ObjectType):
-    # Relay connections that accept a nested "filter" arg and "orderBy"
-    all_customers = graphene.relay.ConnectionField(
-        CustomerType._meta.connection,
+    # Relay connections that accept a nested "filter" arg and "orderBy".
+    # DjangoConnectionField slices the queryset in SQL (COUNT + LIMIT/OFFSET) and
+    # caps page size at RELAY_CONNECTION_MAX_LIMIT, instead of len()-ing every row.
+    all_customers = DjangoConnectionField(
+        CustomerType,
         filter=CustomerFilterInput(),
         order_by=graphene.List(of_type=graphene.String)
     )
-    all_products = graphene.relay.ConnectionField(
-        ProductType._meta.connection,
+    all_products = DjangoConnectionField(
+        ProductType,
         filter=ProductFilterInput(),
         order_by=graphene.List(of_type=graphene.String)
     )
-    all_orders = graphene.relay.ConnectionField(
-        OrderType._meta.connection,
+    all_orders = DjangoConnectionField(
+        OrderType,
         filter=OrderFilterInput(),
         order_by=graphene.List(of_type=graphene.String)
     )
 
     # --- Resolvers ---
     def resolve_all_customers(self, info, filter=None, order_by=None, **kwargs):
-        qs = Customer.objects.all()
+        fields = get_selected_fields(info)
+        qs = prefetch_selected(Customer.objects.all(), fields, {"orders": {"orders"}})
 
         if filter:
             if filter.nameIcontains:
@@ -252,10 +365,15 @@ class Query(graphene.ObjectType):
         if order_by:
             qs = qs.order_by(*order_by)
 
+        columns = get_selected_columns(fields, Customer) if fields is not None else None
+        if columns:
+            qs = qs.only(*columns)
+
         return qs
 
     def resolve_all_products(self, info, filter=None, order_by=None, **kwargs):
-        qs = Product.objects.all()
+        fields = get_selected_fields(info)
+        qs = prefetch_selected(Product.objects.all(), fields, {"orders": {"orders"}})
 
         if filter:
             if filter.nameIcontains:
@@ -274,10 +392,16 @@ class Query(graphene.ObjectType):
         if order_by:
             qs = qs.order_by(*order_by)
 
+        columns = get_selected_columns(fields, Product) if fields is not None else None
+        if columns:
+            qs = qs.only(*columns)
+
         return qs
 
     def resolve_all_orders(self, info, filter=None, order_by=None, **kwargs):
-        qs = Order.objects.all()
+        # customers are batched by the DataLoader in OrderType.resolve_customer
+        fields = get_selected_fields(info)
+        qs = prefetch_selected(Order.objects.all(), fields, {"products": {"products", "product"}})
 
         if filter:
             if filter.totalAmountGte is not None:
@@ -298,6 +422,10 @@ class Query(graphene.ObjectType):
         if order_by:
             qs = qs.order_by(*order_by)
 
+        columns = get_selected_columns(fields, Order) if fields is not None else None
+        if columns:
+            qs = qs.only(*columns)
+
         # Distinct to avoid duplicates when joining products
         return qs.distinct()
 
@@ -0,0 +1,18 @@
+# crm/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_query_cache
+from .models import Customer, Order, Product
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Order)
+@receiver(m2m_changed, sender=Order.products.through)
+def invalidate_graphql_cache(sender, **kwargs):
+    # writes made outside the GraphQL view (admin, shell, cron) must not serve stale data
+    invalidate_query_cache()
@@ -1,3 +1,339 @@
-from django.test import TestCase
+import datetime
+import importlib
+import json
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import graphene
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from graphene_django.registry import get_global_registry
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql import get_introspection_query
+
+from .cache import get_cache, is_enabled, query_cache_key
+from .models import Customer, Order, Product
+# registers the live DjangoObjectTypes before the legacy schemas are imported
+from . import schema as live_schema  # noqa: F401
+
+
+def queries_on(ctx, table):
+    """SQL statements captured by ``ctx`` that touch the given table."""
+    return [q["sql"] for q in ctx.captured_queries if f'"{table}"' in q["sql"]]
+
+
+class CRMGraphQLTestCase(GraphQLTestCase):
+    GRAPHQL_URL = "/graphql"
+
+    def run_query(self, query, **kwargs):
+        response = self.query(query, **kwargs)
+        return response, json.loads(response.content)
+
+
+class PrefetchTests(CRMGraphQLTestCase):
+    def setUp(self):
+        customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        product = Product.objects.create(name="Laptop", price="999.99", stock=3)
+        order = Order.objects.create(customer=customer, total_amount=product.price)
+        order.products.add(product)
+
+    def test_orders_not_prefetched_when_not_selected(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response, _ = self.run_query("{ allCustomers { edges { node { name } } } }")
+        self.assertResponseNoErrors(response)
+        self.assertEqual(queries_on(ctx, "crm_order"), [])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response, _ = self.run_query("{ allProducts { edges { node { name } } } }")
+        self.assertResponseNoErrors(response)
+        self.assertEqual(queries_on(ctx, "crm_order"), [])
+
+    def test_orders_prefetched_when_selected(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response, content = self.run_query(
+                "{ allCustomers { edges { node { name orders { edges { node { id } } } } } } }"
+            )
+        self.assertResponseNoErrors(response)
+        node = content["data"]["allCustomers"]["edges"][0]["node"]
+        self.assertEqual(len(node["orders"]["edges"]), 1)
+        self.assertTrue(queries_on(ctx, "crm_order"))
+
+
+class CustomerLoaderTests(CRMGraphQLTestCase):
+    def setUp(self):
+        for i in range(2):
+            customer = Customer.objects.create(name=f"Customer {i}", email=f"c{i}@example.com")
+            for _ in range(3):
+                Order.objects.create(customer=customer)
+
+    def test_order_customers_are_batched_into_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response, content = self.run_query(
+                "{ allOrders { edges { node { customer { name } } } } }"
+            )
+        self.assertResponseNoErrors(response)
+        names = [edge["node"]["customer"]["name"] for edge in content["data"]["allOrders"]["edges"]]
+        self.assertEqual(sorted(names), ["Customer 0"] * 3 + ["Customer 1"] * 3)
+        self.assertEqual(len(queries_on(ctx, "crm_customer")), 1)
+
+
+# LocMemCache stands in for Redis/Memcached; the tests share one process
+@mock.patch("crm.cache.SHARED_BACKENDS", (LocMemCache,))
+class QueryCacheTests(CRMGraphQLTestCase):
+    PRODUCTS_QUERY = "{ allProducts { edges { node { name } } } }"
+
+    def setUp(self):
+        get_cache().clear()
+        Product.objects.create(name="Laptop", price="999.99", stock=3)
+
+    def product_names(self):
+        response, content = self.run_query(self.PRODUCTS_QUERY)
+        self.assertResponseNoErrors(response)
+        return [edge["node"]["name"] for edge in content["data"]["allProducts"]["edges"]]
+
+    def test_cache_hit_runs_no_sql(self):
+        first = self.product_names()
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.product_names()
+        self.assertEqual(first, second)
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_mutation_invalidates_cached_results(self):
+        self.assertEqual(self.product_names(), ["Laptop"])
+        response, _ = self.run_query(
+            'mutation { createProduct(input: {name: "Mouse", price: "25.00", stock: 10}) { product { id } } }'
+        )
+        self.assertResponseNoErrors(response)
+        self.assertEqual(sorted(self.product_names()), ["Laptop", "Mouse"])
+
+    def test_model_write_outside_graphql_invalidates_cached_results(self):
+        self.assertEqual(self.product_names(), ["Laptop"])
+        Product.objects.create(name="Monitor", price="150.00", stock=2)
+        self.assertEqual(sorted(self.product_names()), ["Laptop", "Monitor"])
+
+    def test_errored_results_are_not_cached(self):
+        query = '{ allCustomers(orderBy: ["no_such_field"]) { edges { node { name } } } }'
+        response, content = self.run_query(query)
+        self.assertTrue(content.get("errors"))
+        self.assertIsNone(get_cache().get(query_cache_key(query, None, None)))
+
+
+class QueryCacheDisabledTests(CRMGraphQLTestCase):
+    def test_off_without_a_shared_cache_backend(self):
+        self.assertFalse(is_enabled())
+        Product.objects.create(name="Laptop", price="999.99", stock=3)
+        self.run_query("{ allProducts { edges { node { name } } } }")
+        with CaptureQueriesContext(connection) as ctx:
+            response, _ = self.run_query("{ allProducts { edges { node { name } } } }")
+        self.assertResponseNoErrors(response)
+        self.assertTrue(queries_on(ctx, "crm_product"))
+
+
+class BulkCreateCustomersTests(CRMGraphQLTestCase):
+    MUTATION = """
+        mutation($input: [CustomerInput!]!) {
+            bulkCreateCustomers(input: $input) {
+                customers { id name email }
+                errors
+            }
+        }
+    """
+
+    def bulk_create(self, records):
+        response, content = self.run_query(self.MUTATION, variables={"input": records})
+        self.assertResponseNoErrors(response)
+        return content["data"]["bulkCreateCustomers"]
+
+    def test_creates_valid_records_and_reports_errors_in_input_order(self):
+        Customer.objects.create(name="Existing", email="taken@example.com")
+
+        result = self.bulk_create([
+            {"name": "Again", "email": "taken@example.com"},
+            {"name": "Bad", "email": "not-an-email"},
+            {"name": "Bob", "email": "bob@example.com", "phone": "+1234567890"},
+            {"name": "Bob twice", "email": "bob@example.com"},
+        ])
+
+        self.assertEqual(
+            [(c["name"], c["email"]) for c in result["customers"]],
+            [("Bob", "bob@example.com")],
+        )
+        self.assertTrue(all(c["id"] for c in result["customers"]))
+        self.assertEqual(len(result["errors"]), 3)
+        self.assertEqual(result["errors"][0], "Email already exists: taken@example.com")
+        self.assertTrue(result["errors"][1].startswith("not-an-email:"))
+        self.assertEqual(result["errors"][2], "Email already exists: bob@example.com")
+        self.assertEqual(Customer.objects.filter(email="bob@example.com").count(), 1)
+        self.assertEqual(Customer.objects.get(email="taken@example.com").name, "Existing")
+
+    def test_row_inserted_concurrently_is_not_reported_as_created(self):
+        # Pretend another request inserted this email after our insert started:
+        # the read-back sees it, but it holds someone else's data.
+        Customer.objects.create(name="Someone else", email="race@example.com")
+        started_at = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+        with mock.patch("django.utils.timezone.now", return_value=started_at):
+            result = self.bulk_create([{"name": "Mine", "email": "race@example.com"}])
+
+        self.assertEqual(result["customers"], [])
+        self.assertEqual(result["errors"], ["Email already exists: race@example.com"])
+
+
+class CreateOrderTests(CRMGraphQLTestCase):
+    MUTATION = """
+        mutation($customerId: ID!, $productIds: [ID]!) {
+            createOrder(input: {customerId: $customerId, productIds: $productIds}) {
+                order { id totalAmount }
+            }
+        }
+    """
+
+    def setUp(self):
+        self.customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        self.laptop = Product.objects.create(name="Laptop", price="999.99", stock=3)
+        self.mouse = Product.objects.create(name="Mouse", price="25.00", stock=10)
+
+    def create_order(self, customer_id, product_ids):
+        return self.run_query(
+            self.MUTATION,
+            variables={"customerId": str(customer_id), "productIds": [str(pk) for pk in product_ids]},
+        )
+
+    def assertOrderRejected(self, content, message):
+        self.assertIn(message, content["errors"][0]["message"])
+        self.assertFalse(Order.objects.exists())
+
+    def test_creates_order_with_total_and_product_rows(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response, content = self.create_order(self.customer.pk, [self.laptop.pk, self.mouse.pk])
+        self.assertResponseNoErrors(response)
+        self.assertEqual(content["data"]["createOrder"]["order"]["totalAmount"], "1024.99")
+
+        order = Order.objects.get()
+        self.assertEqual(order.customer_id, self.customer.pk)
+        self.assertEqual(order.total_amount, Decimal("1024.99"))
+        rows = Order.products.through.objects.filter(order=order)
+        self.assertEqual(
+            sorted(rows.values_list("product_id", flat=True)),
+            sorted([self.laptop.pk, self.mouse.pk]),
+        )
+        # one lookup each, one INSERT for the order, one multi-row INSERT for its products
+        for table in ("crm_customer", "crm_product", "crm_order", "crm_order_products"):
+            self.assertEqual(len(queries_on(ctx, table)), 1, table)
+
+    def test_invalid_product_id_is_rejected(self):
+        _, content = self.create_order(self.customer.pk, [self.laptop.pk, 9999])
+        self.assertOrderRejected(content, "Some product IDs are invalid")
+
+    def test_missing_products_are_rejected(self):
+        _, content = self.create_order(self.customer.pk, [9998, 9999])
+        self.assertOrderRejected(content, "No valid products found")
+
+    def test_invalid_customer_is_rejected(self):
+        _, content = self.create_order(9999, [self.laptop.pk])
+        self.assertOrderRejected(content, "Invalid customer ID")
+
+    def test_duplicate_product_ids_are_rejected(self):
+        _, content = self.create_order(self.customer.pk, [self.laptop.pk, self.laptop.pk])
+        self.assertOrderRejected(content, f"Duplicate product IDs: {self.laptop.pk}")
+
+
+class LegacySchemaCreateOrderTests(TestCase):
+    """The unused legacy schemas reject repeated product IDs like the live one."""
+
+    MUTATION = """
+        mutation($customerId: ID!, $productIds: [ID]!) {
+            createOrder(input: {customerId: $customerId, productIds: $productIds}) {
+                success errors
+            }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # the legacy modules register their own DjangoObjectTypes for the CRM
+        # models; build their schemas, then restore the live schema's registry
+        registry = get_global_registry()
+        live_types = dict(registry._registry)
+        try:
+            cls.schemas = {}
+            for name in ("crm.old-schema", "crm.old-schema3"):
+                module = importlib.import_module(name)
+                cls.schemas[name] = graphene.Schema(
+                    query=module.Query, mutation=module.Mutation
+                )
+        finally:
+            registry._registry.clear()
+            registry._registry.update(live_types)
+
+    def test_duplicate_product_ids_are_rejected(self):
+        customer = Customer.objects.create(name="Ada", email="ada@example.com")
+        product = Product.objects.create(name="Laptop", price="999.99", stock=3)
+        for name, schema in self.schemas.items():
+            with self.subTest(schema=name):
+                result = schema.execute(
+                    self.MUTATION,
+                    variable_values={
+                        "customerId": str(customer.pk),
+                        "productIds": [str(product.pk), str(product.pk)],
+                    },
+                )
+                self.assertIsNone(result.errors)
+                payload = result.data["createOrder"]
+                self.assertFalse(payload["success"])
+                self.assertIn("Duplicate product ID", payload["errors"][0])
+                self.assertFalse(Order.objects.exists())
+
+
+class ValidationLimitTests(CRMGraphQLTestCase):
+    def assertRejected(self, query, message):
+        response, content = self.run_query(query)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(message, content["errors"][0]["message"])
+
+    def test_relay_nesting_does_not_count_toward_depth(self):
+        response, _ = self.run_query(
+            "{ allCustomers { edges { node { orders { edges { node {"
+            " products { edges { node { name } } } } } } } } } }"
+        )
+        self.assertResponseNoErrors(response)
+
+    def test_too_deep_operation_is_rejected(self):
+        # allOrders > customer > orders > customer > ... > name: nine levels
+        inner = "customer { name }"
+        for _ in range(3):
+            inner = f"customer {{ orders {{ edges {{ node {{ {inner} }} }} }} }}"
+        query = f"{{ allOrders {{ edges {{ node {{ {inner} }} }} }} }}"
+        self.assertRejected(query, "maximum operation depth")
+
+    def test_too_expensive_operation_is_rejected(self):
+        # 100 aliased allOrders connections at 13 each: cost 1300, depth 2
+        fields = " ".join(f"o{i}: allOrders {{ edges {{ node {{ id }} }} }}" for i in range(100))
+        self.assertRejected(f"{{ {fields} }}", "maximum operation cost")
+
+    def test_repeated_fragment_spreads_are_measured_once(self):
+        # F0 spreads F1 twice, F1 spreads F2 twice, ...: 2**22 copies of `id`
+        # once expanded, but a linear amount of work to validate
+        fragments = "".join(
+            f"fragment F{i} on OrderType {{ ...F{i + 1} ...F{i + 1} }} " for i in range(22)
+        )
+        fragments += "fragment F22 on OrderType { id }"
+        query = "{ allOrders { edges { node { ...F0 } } } } " + fragments
+        started = time.monotonic()
+        self.assertRejected(query, "maximum operation cost")
+        self.assertLess(time.monotonic() - started, 2)
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=2)
+    def test_limits_are_read_from_settings_per_request(self):
+        self.assertRejected(
+            "{ allOrders { edges { node { customer { name } } } } }", "maximum operation depth of 2"
+        )
+
+    def test_introspection_is_allowed(self):
+        response, content = self.run_query(get_introspection_query())
+        self.assertResponseNoErrors(response)
+        self.assertIn("__schema", content["data"])
@@ -0,0 +1,145 @@
+# crm/validation.py
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    ValidationRule,
+    specified_rules,
+)
+
+# Relative cost of resolving a field; anything not listed costs DEFAULT_FIELD_COST.
+# List fields that fan out per parent are weighted higher.
+FIELD_COSTS = {
+    "allOrders": 10,
+    "allCustomers": 5,
+    "allProducts": 5,
+    "products": 5,
+    "orders": 5,
+}
+DEFAULT_FIELD_COST = 1
+
+# Relay wraps every connection in edges { node { ... } }; those levels add
+# nesting but no resolver fan-out, so they don't count toward depth.
+CONNECTION_WRAPPER_FIELDS = frozenset({"edges", "node"})
+
+
+class SelectionLimitRule(ValidationRule):
+    """
+    Base for rules that fold a measure over each operation's selections.
+
+    Every named fragment is measured once and the result reused wherever it
+    is spread, so a chain of fragments that each spread the next one twice is
+    checked in time linear in the document, not in its exponential expansion.
+    Introspection fields are skipped.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.fragment_measures = {}
+
+    def measure_field(self, field):
+        raise NotImplementedError
+
+    def combine(self, measures):
+        raise NotImplementedError
+
+    def measure(self, selection_set):
+        if selection_set is None:
+            return 0
+        return self.combine(self.measure_selection(s) for s in selection_set.selections)
+
+    def measure_selection(self, selection):
+        if isinstance(selection, FieldNode):
+            if selection.name.value.startswith("__"):
+                return 0
+            return self.measure_field(selection)
+        if isinstance(selection, InlineFragmentNode):
+            return self.measure(selection.selection_set)
+        if isinstance(selection, FragmentSpreadNode):
+            return self.measure_fragment(selection.name.value)
+        return 0
+
+    def measure_fragment(self, name):
+        if name not in self.fragment_measures:
+            fragment = self.context.get_fragment(name)
+            # cycles are reported by NoFragmentCyclesRule; the placeholder
+            # just stops this rule from looping on them
+            self.fragment_measures[name] = 0
+            if fragment is not None:
+                self.fragment_measures[name] = self.measure(fragment.selection_set)
+        return self.fragment_measures[name]
+
+
+class DepthLimitRule(SelectionLimitRule):
+    """
+    Reject operations nested deeper than ``settings.GRAPHQL_MAX_QUERY_DEPTH``
+    fields, not counting relay's edges/node wrappers.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.max_depth = getattr(settings, "GRAPHQL_MAX_QUERY_DEPTH", 8)
+
+    def measure_field(self, field):
+        return int(field.name.value not in CONNECTION_WRAPPER_FIELDS) + self.measure(
+            field.selection_set
+        )
+
+    def combine(self, measures):
+        return max(measures, default=0)
+
+    def enter_operation_definition(self, node, *_args):
+        depth = self.measure(node.selection_set)
+        if depth > self.max_depth:
+            name = node.name.value if node.name else "anonymous"
+            self.report_error(
+                GraphQLError(
+                    f"'{name}' exceeds maximum operation depth of {self.max_depth} (depth {depth}).",
+                    [node],
+                )
+            )
+
+
+class CostLimitRule(SelectionLimitRule):
+    """
+    Reject operations whose summed field cost (see FIELD_COSTS) exceeds
+    ``settings.GRAPHQL_MAX_QUERY_COST``. Summing stops once the budget is
+    exceeded, so the reported cost is a lower bound.
+    """
+
+    field_costs = FIELD_COSTS
+    default_cost = DEFAULT_FIELD_COST
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.max_cost = getattr(settings, "GRAPHQL_MAX_QUERY_COST", 1000)
+
+    def measure_field(self, field):
+        cost = self.field_costs.get(field.name.value, self.default_cost)
+        return cost + self.measure(field.selection_set)
+
+    def combine(self, measures):
+        total = 0
+        for cost in measures:
+            total += cost
+            if total > self.max_cost:
+                break
+        return total
+
+    def enter_operation_definition(self, node, *_args):
+        cost = self.measure(node.selection_set)
+        if cost > self.max_cost:
+            name = node.name.value if node.name else "anonymous"
+            self.report_error(
+                GraphQLError(
+                    f"'{name}' exceeds maximum operation cost of {self.max_cost} (cost at least {cost}).",
+                    [node],
+                )
+            )
+
+
+def get_validation_rules():
+    """The standard GraphQL rules plus depth and cost limits for the CRM endpoint."""
+    return (*specified_rules, DepthLimitRule, CostLimitRule)
@@ -1,3 +1,61 @@
-from django.shortcuts import render
+import logging
 
-# Create your views here.
+from graphene_django.views import GraphQLView
+from graphql import ExecutionResult, GraphQLError, OperationType, get_operation_ast, parse
+
+from .cache import get_cache, get_timeout, invalidate_query_cache, is_enabled, query_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class CachedGraphQLView(GraphQLView):
+    """GraphQLView that serves repeated read-only queries from Django's cache.
+
+    Caching only happens when the default cache is Redis or Memcached (see
+    ``crm.cache.is_enabled``); it is off with the default settings. Only
+    error-free ``query`` operations are cached, and an unreachable cache is
+    treated as a miss. Any other operation that runs through the view (i.e. a
+    mutation) invalidates every cached result, which also covers writes that
+    bypass model signals such as bulk_create.
+    """
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        if not query or show_graphiql or not is_enabled():
+            return super().execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+        try:
+            operation_ast = get_operation_ast(parse(query), operation_name)
+        except GraphQLError:
+            operation_ast = None
+
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            result = super().execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+            if operation_ast is not None and operation_ast.operation == OperationType.MUTATION:
+                invalidate_query_cache()
+            return result
+
+        cache = get_cache()
+        try:
+            key = query_cache_key(query, variables, operation_name)
+            cached = cache.get(key)
+        except Exception:
+            logger.exception("GraphQL query cache lookup failed")
+            key = cached = None
+        if cached is not None:
+            return ExecutionResult(data=cached)
+
+        result = super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if key is not None and result is not None and not result.errors:
+            try:
+                cache.set(key, result.data, get_timeout())
+            except Exception:
+                logger.exception("Could not store GraphQL query result in the cache")
+        return result